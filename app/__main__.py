@@ -14,5 +14,6 @@ if __name__ == "__main__":
         host=settings.app_host,
         port=settings.app_port,
         log_level=settings.log_level,
+        loop="auto",  # uvloop when installed (uvicorn[standard]), asyncio otherwise
         reload=True,
     )
@@ -12,14 +12,17 @@ via the Qwen3 LLM through LangChain.
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
-import re
-from typing import Dict, List
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
-from app.clients import chat_completion
+import orjson
+
+from app.clients import chat_completion, extract_json_block
 from app.clients.tmdb import get_genre_list, search_keyword
 from app.models import ExtractedEntities
+from app.text_processor import fold_key
 
 logger = logging.getLogger(__name__)
 
@@ -81,37 +84,88 @@ _GENRE_NAME_MAP: Dict[str, List[str]] = {
 }
 
 
+# (es map, en map, folded name → id) for the genre maps last seen from TMDB.
+# The TMDB client hands back the same cached dicts for 24 h, so the index is
+# rebuilt only when those change.
+_genre_index: Optional[Tuple[Dict[int, str], Dict[int, str], Dict[str, int]]] = None
+
+
+def _build_genre_index(genre_map: Dict[int, str], genre_map_en: Dict[int, str]) -> Dict[str, int]:
+    """Folded TMDB names (es + en), then Spanish aliases via their English name."""
+    index = {fold_key(v): k for k, v in genre_map.items()}
+    index.update({fold_key(v): k for k, v in genre_map_en.items()})
+    for alias, en_names in _GENRE_NAME_MAP.items():
+        key = fold_key(alias)
+        if key in index:
+            continue
+        for en_name in en_names:
+            gid = index.get(fold_key(en_name))
+            if gid is not None:
+                index[key] = gid
+                break
+    return index
+
+
 async def _resolve_genre_ids(genre_names: List[str]) -> List[int]:
-    """Map genre names (Spanish or English) to TMDB genre IDs."""
-    genre_map = await get_genre_list("es-ES")
-    inv = {v.lower(): k for k, v in genre_map.items()}
-    genre_map_en = await get_genre_list("en-US")
-    inv_en = {v.lower(): k for k, v in genre_map_en.items()}
-    inv.update(inv_en)
-
-    ids: List[int] = []
-    for name in genre_names:
-        low = name.strip().lower()
-        if low in inv:
-            ids.append(inv[low])
-        else:
-            for en_name in _GENRE_NAME_MAP.get(low, []):
-                if en_name.lower() in inv:
-                    ids.append(inv[en_name.lower()])
-                    break
-    return list(set(ids))
+    """Map genre names (Spanish or English, any case/accents) to TMDB genre IDs."""
+    global _genre_index
+    genre_map, genre_map_en = await asyncio.gather(
+        get_genre_list("es-ES"), get_genre_list("en-US"),
+    )
+    if _genre_index is None or _genre_index[0] is not genre_map or _genre_index[1] is not genre_map_en:
+        _genre_index = (genre_map, genre_map_en, _build_genre_index(genre_map, genre_map_en))
+    index = _genre_index[2]
+
+    return list({gid for name in genre_names if (gid := index.get(fold_key(name))) is not None})
 
 
 async def _resolve_keyword_ids(keywords: List[str]) -> List[int]:
-    """Resolve text keywords to TMDB keyword IDs via search."""
-    ids: List[int] = []
-    for kw in keywords[:5]:
-        results = await search_keyword(kw)
-        if results:
-            ids.append(results[0]["id"])
+    """
+    Resolve text keywords to TMDB keyword IDs via concurrent search.
+    Concurrency is capped by the TMDB client's shared request semaphore.
+    """
+    ids, _ = await _search_keyword_ids(keywords)
     return ids
 
 
+async def _search_keyword_ids(keywords: List[str]) -> Tuple[List[int], bool]:
+    """``_resolve_keyword_ids`` plus whether every search succeeded."""
+    keywords = keywords[:5]
+    unique = list(dict.fromkeys(keywords))
+    results = await asyncio.gather(
+        *(search_keyword(kw) for kw in unique), return_exceptions=True,
+    )
+
+    id_map: Dict[str, int] = {}
+    complete = True
+    for kw, res in zip(unique, results):
+        if isinstance(res, BaseException):
+            logger.warning("TMDB keyword search failed for %r: %s", kw, res)
+            complete = False
+        elif res:
+            id_map[kw] = res[0]["id"]
+    return [id_map[kw] for kw in keywords if kw in id_map], complete
+
+
+# ── Extraction cache (LRU) ───────────────────────────────
+
+# Normalised query → entities. Extraction runs at near-zero temperature, so a
+# repeated query reuses the first result instead of another LLM round-trip.
+_ENTITY_CACHE: OrderedDict[str, ExtractedEntities] = OrderedDict()
+_ENTITY_CACHE_MAX = 2048
+
+
+def _entity_cache_key(user_query: str) -> str:
+    return " ".join(user_query.casefold().split())
+
+
+def _remember_entities(key: str, entities: ExtractedEntities) -> None:
+    _ENTITY_CACHE[key] = entities.model_copy(deep=True)
+    _ENTITY_CACHE.move_to_end(key)
+    if len(_ENTITY_CACHE) > _ENTITY_CACHE_MAX:
+        _ENTITY_CACHE.popitem(last=False)
+
+
 # ── Extraction with retry (Strategy pattern) ─────────────
 
 
@@ -119,7 +173,17 @@ async def extract_entities(user_query: str, *, retry: int = 0) -> ExtractedEntit
     """
     Send the user query to the LLM and return structured entities.
     Uses retry strategy: up to 3 attempts, lowering temperature on failure.
+    Successful extractions are memoised per normalised query; callers always
+    get their own copy.
     """
+    cache_key = _entity_cache_key(user_query)
+    if retry == 0:
+        cached = _ENTITY_CACHE.get(cache_key)
+        if cached is not None:
+            _ENTITY_CACHE.move_to_end(cache_key)
+            logger.debug("Entity cache HIT: %r", cache_key)
+            return cached.model_copy(deep=True)
+
     temperature = 0.1 if retry == 0 else 0.0
     messages = [
         {"role": "system", "content": _SYSTEM_PROMPT},
@@ -133,19 +197,12 @@ async def extract_entities(user_query: str, *, retry: int = 0) -> ExtractedEntit
         top_p=0.9,
     )
 
-    # Strip markdown fences
-    cleaned = raw.strip()
-    cleaned = re.sub(r"^```(?:json)?\s*", "", cleaned)
-    cleaned = re.sub(r"\s*```$", "", cleaned)
-
-    # Find JSON object
-    match = re.search(r"\{.*\}", cleaned, re.DOTALL)
-    if match:
-        cleaned = match.group(0)
+    # Strip markdown fences and isolate the JSON object
+    cleaned = extract_json_block(raw)
 
     try:
-        data = json.loads(cleaned)
-    except json.JSONDecodeError:
+        data = orjson.loads(cleaned)
+    except orjson.JSONDecodeError:
         if retry < 2:
             logger.warning("LLM returned invalid JSON (attempt %d), retrying…", retry + 1)
             return await extract_entities(user_query, retry=retry + 1)
@@ -163,9 +220,11 @@ async def extract_entities(user_query: str, *, retry: int = 0) -> ExtractedEntit
         exclude=data.get("exclude", []),
     )
 
-    # Resolve IDs via TMDB
-    entities.genre_ids = await _resolve_genre_ids(entities.genres)
-    entities.keyword_ids = await _resolve_keyword_ids(entities.keywords)
+    # Resolve IDs via TMDB (independent lookups, run concurrently)
+    entities.genre_ids, (entities.keyword_ids, keywords_complete) = await asyncio.gather(
+        _resolve_genre_ids(entities.genres),
+        _search_keyword_ids(entities.keywords),
+    )
 
     logger.info(
         "Extracted entities: genres=%s keyword_ids=%s region=%s mood=%s era=%s",
@@ -175,4 +234,7 @@ async def extract_entities(user_query: str, *, retry: int = 0) -> ExtractedEntit
         entities.mood,
         entities.era,
     )
+    # A failed keyword search leaves the entities degraded; don't pin that
+    if keywords_complete:
+        _remember_entities(cache_key, entities)
     return entities
@@ -47,7 +47,7 @@ def enrich_query_with_profile(
     hints["preferred_genres"] = profile.top_genres(5)
     hints["preferred_moods"] = profile.top_moods(3)
     hints["archetype_tags"] = profile.tags
-    hints["avoid_movies"] = profile.liked_movies[-10:]  # avoid re-recommending
+    hints["avoid_movies"] = list(profile.liked_movies)[-10:]  # avoid re-recommending
 
     # Build personality note for narrative
     if profile.tags:
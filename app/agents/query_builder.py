@@ -10,10 +10,14 @@ Design patterns:
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+import re
+import sys
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, TypedDict
 
 from app.clients.tmdb import discover_movies, search_movies
 from app.models import ExtractedEntities
+from app.text_processor import fold_key
 
 logger = logging.getLogger(__name__)
 
@@ -50,20 +54,60 @@ _REGION_MAP: Dict[str, str] = {
     "corea": "KR", "korea": "KR",
 }
 
+# Folded alias → ISO code, so "Japon" / "ESPAÑA" hit with a single lookup
+_REGION_INDEX: Dict[str, str] = {fold_key(k): v for k, v in _REGION_MAP.items()}
 
+
+@lru_cache(maxsize=256)
 def _resolve_region(region: Optional[str]) -> Optional[str]:
     """Normalise a region string to ISO 3166-1 alpha-2."""
     if not region:
         return None
-    low = region.strip().lower()
-    # Already a 2-letter code?
-    if len(low) == 2 and low.isalpha():
-        return low.upper()
-    return _REGION_MAP.get(low)
+    key = fold_key(region)
+    # Already a 2-letter code? Interned so "es"/"ES" share one object with the
+    # table values (literals, already interned)
+    if len(key) == 2 and key.isalpha():
+        return sys.intern(key.upper())
+    return _REGION_INDEX.get(key)
+
+
+# ── Mood → rating strategy ────────────────────────────────
+
+# Folded mood words that relax the rating floor: auteur/indie/dark titles
+# tend to have fewer, harsher votes
+_DARK_MOODS: FrozenSet[str] = frozenset({
+    "oscuro", "oscura", "oscuros", "oscuras", "oscuridad",
+    "dark", "darker", "darkest", "darkness",
+    "sombrio", "sombria", "noir", "denso", "densa", "crudo", "cruda",
+    "autor", "autoral", "independiente", "independientes", "indie",
+})
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _is_dark_mood(mood: str) -> bool:
+    return not _DARK_MOODS.isdisjoint(_WORD_RE.findall(fold_key(mood)))
 
 
 # ── Params Builder ────────────────────────────────────────
 
+# Plain dict handed straight to httpx as query params; the dotted TMDB names
+# need the functional TypedDict form
+DiscoverParams = TypedDict("DiscoverParams", {
+    "language": str,
+    "sort_by": str,
+    "include_adult": bool,
+    "page": int,
+    "with_genres": str,
+    "with_keywords": str,
+    "region": str,
+    "watch_region": str,
+    "with_original_language": str,
+    "primary_release_date.gte": str,
+    "primary_release_date.lte": str,
+    "vote_average.gte": float,
+}, total=False)
+
 
 def build_discover_params(
     entities: ExtractedEntities,
@@ -72,9 +116,9 @@ def build_discover_params(
     min_year: Optional[int] = None,
     min_rating: Optional[float] = None,
     page: int = 1,
-) -> Dict[str, Any]:
+) -> DiscoverParams:
     """Convert ExtractedEntities into TMDB /discover/movie parameters."""
-    params: Dict[str, Any] = {
+    params: DiscoverParams = {
         "language": language,
         "sort_by": "popularity.desc",
         "include_adult": False,
@@ -82,10 +126,10 @@ def build_discover_params(
     }
 
     if entities.genre_ids:
-        params["with_genres"] = ",".join(str(g) for g in entities.genre_ids)
+        params["with_genres"] = ",".join(map(str, entities.genre_ids))
 
     if entities.keyword_ids:
-        params["with_keywords"] = ",".join(str(k) for k in entities.keyword_ids)
+        params["with_keywords"] = ",".join(map(str, entities.keyword_ids))
 
     region = _resolve_region(entities.region)
     if region:
@@ -93,17 +137,15 @@ def build_discover_params(
         params["watch_region"] = region
 
     if entities.language:
-        params["with_original_language"] = entities.language
+        params["with_original_language"] = sys.intern(entities.language)
 
     if entities.era:
-        era_low = entities.era.strip().lower()
-        if era_low in _ERA_MAP:
-            gte, lte = _ERA_MAP[era_low]
-            params["primary_release_date.gte"] = gte
-            params["primary_release_date.lte"] = lte
+        era_range = _ERA_MAP.get(entities.era.strip().lower())
+        if era_range:
+            params["primary_release_date.gte"], params["primary_release_date.lte"] = era_range
 
     # Mood-based quality adjustment (Strategy)
-    if entities.mood and any(w in entities.mood.lower() for w in ("oscuro", "autor", "independiente", "indie", "dark")):
+    if entities.mood and _is_dark_mood(entities.mood):
         params["vote_average.gte"] = 5.0
     else:
         params["vote_average.gte"] = min_rating or 6.0
@@ -9,13 +9,17 @@ Design patterns:
 
 from __future__ import annotations
 
-import json
+import heapq
 import logging
-import re
-from typing import AsyncIterator, Dict, List, Set
+from functools import lru_cache
+from operator import attrgetter
+from typing import AsyncIterator, Dict, Iterator, List, Set
 
-from app.clients import chat_completion, stream_chat
+import orjson
+
+from app.clients import chat_completion, extract_json_block, stream_chat
 from app.models import EnrichedFilm, RankedFilm
+from app.text_processor import clean_narrative, fold_key
 
 logger = logging.getLogger(__name__)
 
@@ -51,6 +55,19 @@ def _build_rerank_user_prompt(user_query: str, films: List[EnrichedFilm]) -> str
     )
 
 
+def _as_tmdb_id(value: object) -> int:
+    """Integer TMDB id from LLM JSON; rejects bools and non-integral floats."""
+    if isinstance(value, bool):
+        raise TypeError(f"invalid id: {value!r}")
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"non-integral id: {value!r}")
+        return int(value)
+    if isinstance(value, (int, str)):
+        return int(value)
+    raise TypeError(f"invalid id: {value!r}")
+
+
 async def rerank_films(
     user_query: str,
     films: List[EnrichedFilm],
@@ -72,34 +89,33 @@ async def rerank_films(
     )
 
     # Parse JSON array
-    cleaned = raw.strip()
-    cleaned = re.sub(r"^```(?:json)?\s*", "", cleaned)
-    cleaned = re.sub(r"\s*```$", "", cleaned)
-
-    # Find the JSON array
-    match = re.search(r"\[.*\]", cleaned, re.DOTALL)
-    if match:
-        cleaned = match.group(0)
+    cleaned = extract_json_block(raw, array=True)
 
     try:
-        items = json.loads(cleaned)
-    except json.JSONDecodeError:
+        items = orjson.loads(cleaned)
+    except orjson.JSONDecodeError:
         logger.error("Re-ranker returned invalid JSON: %s", raw[:500])
         # Fallback strategy: rank by TMDB vote_average
         return [
-            RankedFilm(tmdb_id=f.tmdb_id, score=f.vote_average, reason="Puntuación de TMDB (fallback)")
+            RankedFilm.model_construct(
+                tmdb_id=f.tmdb_id, score=f.vote_average, reason="Puntuación de TMDB (fallback)",
+            )
             for f in films
         ]
 
+    # Fields are checked by hand, so skip pydantic validation per item
     ranked: List[RankedFilm] = []
     for item in items:
         try:
-            ranked.append(RankedFilm(
-                tmdb_id=item["id"],
-                score=float(item["score"]),
-                reason=item.get("reason", ""),
+            tmdb_id = _as_tmdb_id(item["id"])
+            score = float(item["score"])
+            reason = item.get("reason", "")
+            ranked.append(RankedFilm.model_construct(
+                tmdb_id=tmdb_id,
+                score=score,
+                reason=reason if isinstance(reason, str) else "",
             ))
-        except (KeyError, ValueError) as exc:
+        except (KeyError, TypeError, ValueError) as exc:
             logger.warning("Skipping malformed ranking item: %s — %s", item, exc)
 
     ranked.sort(key=lambda r: r.score, reverse=True)
@@ -108,6 +124,32 @@ async def rerank_films(
 
 # ── Top-N selection with diversification ──────────────────
 
+_PUNCT_TRANS = str.maketrans("", "", "!?¡¿.,;'\"()[]{}")
+_LEADING_ARTICLES = frozenset({"the", "a", "an", "el", "la", "los", "las"})
+
+
+@lru_cache(maxsize=4096)
+def _title_root(title: str) -> str:
+    """
+    Franchise key: folded title before any ":" subtitle, minus a leading article.
+    Dashes are part of the title ("Tres colores - Azul" ≠ "Tres colores - Rojo").
+    """
+    head = fold_key(title.partition(":")[0].translate(_PUNCT_TRANS))
+    first, _, rest = head.partition(" ")
+    if rest and first in _LEADING_ARTICLES:
+        head = rest.lstrip()
+    return head
+
+
+_BY_SCORE = attrgetter("score")
+
+
+def _in_score_order(ranked: List[RankedFilm], n: int) -> Iterator[RankedFilm]:
+    """Yield ranked films best-first; the full sort only runs if more than n are consumed."""
+    yield from heapq.nlargest(n, ranked, key=_BY_SCORE)
+    if len(ranked) > n:
+        yield from sorted(ranked, key=_BY_SCORE, reverse=True)[n:]
+
 
 def select_top_n(
     ranked: List[RankedFilm],
@@ -122,13 +164,13 @@ def select_top_n(
     selected: List[EnrichedFilm] = []
     seen_titles: Set[str] = set()
 
-    for r in ranked:
+    for r in _in_score_order(ranked, n):
         if len(selected) >= n:
             break
         film = film_map.get(r.tmdb_id)
         if not film:
             continue
-        title_root = film.title.split(":")[0].strip().lower()
+        title_root = _title_root(film.title)
         if title_root in seen_titles:
             continue
         film.relevance_score = r.score
@@ -140,6 +182,8 @@ def select_top_n(
 
 # ── Narrative system prompt (Template Method) ─────────────
 
+# {profile_context} must stay at the very end: everything before it is a
+# byte-identical prefix across users, which vLLM prefix caching reuses.
 _NARRATIVE_SYSTEM = """\
 Eres CineMatch AI, un asistente cinéfilo apasionado y culto.
 
@@ -217,19 +261,20 @@ async def generate_narrative(
     ranked: List[RankedFilm],
     profile_context: str = "",
 ) -> str:
-    """Generate the final narrative response (non-streaming)."""
+    """Generate the final narrative response (non-streaming), already cleaned."""
     messages = [
         {"role": "system", "content": _get_narrative_system(profile_context)},
         {"role": "user", "content": _build_narrative_user_prompt(user_query, films, ranked)},
     ]
 
-    return await chat_completion(
+    raw = await chat_completion(
         messages,
         temperature=0.3,
         max_tokens=1500,
         presence_penalty=0.4,
         frequency_penalty=0.3,
     )
+    return clean_narrative(raw)
 
 
 # ── Real streaming narrative (LangChain astream) ─────────
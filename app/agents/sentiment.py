@@ -12,11 +12,16 @@ Uses regex patterns and an optional LLM call for nuanced understanding.
 
 from __future__ import annotations
 
+import hashlib
 import logging
 import re
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Optional
 
-from app.clients import chat_completion
+import orjson
+
+from app.clients import chat_completion, extract_json_block
 
 logger = logging.getLogger(__name__)
 
@@ -48,12 +53,75 @@ _DETAIL_LEVEL = {
     "brief": re.compile(r"\b(breve|corto|resumen|rápido|brief|quick|short|solo nombres|just names)\b", re.I),
 }
 
+_EMOTION_PATTERNS = {
+    "excitement": re.compile(r"[!]{2,}|wow|increíble|amazing", re.I),
+    "curiosity": re.compile(r"\?|qué|cómo|por qué|dónde|cuándo|what|how|why|where", re.I),
+    "nostalgia": re.compile(r"recuerdo|de pequeño|cuando era|infancia|nostalg|remember|childhood", re.I),
+    "urgency": re.compile(r"rápido|ya|ahora|hoy|tonight|quick|now|hurry", re.I),
+    "frustration": re.compile(r"no entiendes|otra vez|ya te dije|de nuevo|again|already told", re.I),
+}
+
+
+# ── Result cache (LRU) ────────────────────────────────────
+
+# Keyed by a 16-byte digest of the text, so client-sized strings (the
+# /api/sentiment body has no length cap) are never retained. Guarded by a
+# lock because misses are analysed on worker threads.
+_SENTIMENT_CACHE: OrderedDict[bytes, Dict] = OrderedDict()
+_SENTIMENT_CACHE_MAX = 4096
+_sentiment_lock = threading.Lock()
+
+
+def sentiment_key(text: str) -> bytes:
+    """Cache key for ``text``; compute once and pass to the helpers below."""
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def _copy_result(result: Dict) -> Dict:
+    """Per-caller copy, so mutating the returned dict never corrupts the cache."""
+    return {
+        **result,
+        "intents": list(result["intents"]),
+        "emotional_signals": list(result["emotional_signals"]),
+    }
+
+
+def cached_sentiment(key: bytes) -> Optional[Dict]:
+    """
+    Non-blocking cache lookup: the memoized analysis for ``key``, or None.
+    Async callers check this inline and only hop to a thread on a miss.
+    """
+    with _sentiment_lock:
+        result = _SENTIMENT_CACHE.get(key)
+        if result is None:
+            return None
+        _SENTIMENT_CACHE.move_to_end(key)
+    return _copy_result(result)
+
+
+def analyze_sentiment_miss(text: str, key: bytes) -> Dict:
+    """Cache-miss path: analyze ``text`` and memoize it under ``key``."""
+    result = _compute_sentiment(text)
+    with _sentiment_lock:
+        _SENTIMENT_CACHE[key] = result
+        if len(_SENTIMENT_CACHE) > _SENTIMENT_CACHE_MAX:
+            _SENTIMENT_CACHE.popitem(last=False)
+    return _copy_result(result)
+
 
 def analyze_sentiment(text: str) -> Dict:
     """
     Analyze user message sentiment and intent using regex patterns.
-    Returns a structured analysis dict.
+    Returns a structured analysis dict. Results are memoized per text.
     """
+    key = sentiment_key(text)
+    hit = cached_sentiment(key)
+    if hit is not None:
+        return hit
+    return analyze_sentiment_miss(text, key)
+
+
+def _compute_sentiment(text: str) -> Dict:
     result = {
         "sentiment_score": 0.0,  # -1.0 to 1.0
         "sentiment_label": "neutral",
@@ -103,15 +171,7 @@ def analyze_sentiment(text: str) -> Dict:
             break
 
     # Emotional signals
-    emotion_map = {
-        "excitement": re.compile(r"[!]{2,}|wow|increíble|amazing", re.I),
-        "curiosity": re.compile(r"\?|qué|cómo|por qué|dónde|cuándo|what|how|why|where", re.I),
-        "nostalgia": re.compile(r"recuerdo|de pequeño|cuando era|infancia|nostalg|remember|childhood", re.I),
-        "urgency": re.compile(r"rápido|ya|ahora|hoy|tonight|quick|now|hurry", re.I),
-        "frustration": re.compile(r"no entiendes|otra vez|ya te dije|de nuevo|again|already told", re.I),
-    }
-
-    for emotion, pattern in emotion_map.items():
+    for emotion, pattern in _EMOTION_PATTERNS.items():
         if pattern.search(text):
             result["emotional_signals"].append(emotion)
 
@@ -144,13 +204,9 @@ Responde SOLO con JSON:
             max_tokens=200,
         )
 
-        import json
-        clean = raw.strip()
-        clean = re.sub(r"^```(?:json)?\s*", "", clean)
-        clean = re.sub(r"\s*```$", "", clean)
-        match = re.search(r"\{.*\}", clean, re.DOTALL)
-        if match:
-            return json.loads(match.group(0))
+        data = orjson.loads(extract_json_block(raw))
+        if isinstance(data, dict):
+            return data
     except Exception as exc:
         logger.warning("LLM sentiment analysis failed: %s", exc)
 
@@ -38,6 +38,38 @@ Reglas ESTRICTAS:
 - Si el texto ya está bien, devuélvelo tal cual.
 """
 
+# Garble heuristics, compiled once — _is_text_garbled() runs on every narrative
+_CONCAT_RE = re.compile(r'[a-záéíóú][A-ZÁÉÍÓÚ]')
+_PUNCT_CONCAT_RE = re.compile(r'[.!?][a-záéíóúA-Z]')
+
+
+# Zero-width boundaries where a space is missing. Inserted spaces never
+# create or hide another boundary, so one pass equals applying each rule in turn:
+#   lowercase→Uppercase, [.!?,;:»"]→letter, letter→[¡¿]
+_MISSING_SPACE_RE = re.compile(
+    r'(?<=[a-záéíóúüñ])(?=[A-ZÁÉÍÓÚÜÑ])'
+    r'|(?<=[.!?,;:»"])(?=[A-ZÁÉÍÓÚÜÑa-záéíóúüñ])'
+    r'|(?<=[a-záéíóúüñA-ZÁÉÍÓÚÜÑ])(?=[¡¿])'
+)
+
+# Common Spanish words that should be separate
+_COMMON_WORDS = (
+    'que', 'de', 'del', 'en', 'el', 'la', 'los', 'las', 'un', 'una',
+    'con', 'por', 'para', 'como', 'pero', 'sino', 'cuando', 'donde',
+    'porque', 'aunque', 'mientras', 'también', 'además', 'entonces',
+    'sin', 'sobre', 'entre', 'hasta', 'desde', 'durante', 'hacia',
+    'según', 'contra', 'tras', 'mediante', 'se', 'te', 'me', 'le',
+    'no', 'ya', 'más', 'muy', 'tan', 'bien', 'mal', 'así', 'aún',
+    'es', 'son', 'fue', 'ser', 'hay', 'tiene', 'puede', 'hace',
+)
+
+# Applied in order: each pass sees the previous one's output, so they can't
+# be merged into one alternation without changing results.
+_STUCK_WORD_PATTERNS = [
+    (word, re.compile(rf'([a-záéíóúüñ])({word})([^a-záéíóúüñ]|$)', re.IGNORECASE))
+    for word in _COMMON_WORDS
+]
+
 
 def _is_text_garbled(text: str) -> bool:
     """
@@ -66,12 +98,12 @@ def _is_text_garbled(text: str) -> bool:
 
     # Check for common concatenation patterns
     # e.g., lowercase followed by uppercase without space
-    concat_pattern = re.findall(r'[a-záéíóú][A-ZÁÉÍÓÚ]', text)
+    concat_pattern = _CONCAT_RE.findall(text)
     if len(concat_pattern) > 5:
         return True
 
     # Check for punctuation-letter concatenation (e.g., ".Esto" or ",que")
-    punct_concat = re.findall(r'[.!?][a-záéíóúA-Z]', text)
+    punct_concat = _PUNCT_CONCAT_RE.findall(text)
     if len(punct_concat) > 3:
         return True
 
@@ -86,37 +118,18 @@ def _attempt_space_insertion(text: str) -> str:
     if not text:
         return text
 
-    # Insert space before uppercase letter after lowercase
-    text = re.sub(r'([a-záéíóúüñ])([A-ZÁÉÍÓÚÜÑ])', r'\1 \2', text)
-
-    # Insert space after sentence-ending punctuation followed by a letter
-    text = re.sub(r'([.!?])([A-ZÁÉÍÓÚÜÑa-záéíóúüñ])', r'\1 \2', text)
-
-    # Insert space after comma/semicolon followed by a letter (not number)
-    text = re.sub(r'([,;:])([A-ZÁÉÍÓÚÜÑa-záéíóúüñ])', r'\1 \2', text)
-
-    # Insert space before opening exclamation/question marks if preceded by letter
-    text = re.sub(r'([a-záéíóúüñA-ZÁÉÍÓÚÜÑ])([¡¿])', r'\1 \2', text)
-
-    # Insert space after closing punctuation followed by letter
-    text = re.sub(r'([!?»"])([a-záéíóúüñA-ZÁÉÍÓÚÜÑ])', r'\1 \2', text)
-
-    # Fix "que" and common conjunctions stuck to other words
-    # Common Spanish words that should be separate
-    common_words = [
-        'que', 'de', 'del', 'en', 'el', 'la', 'los', 'las', 'un', 'una',
-        'con', 'por', 'para', 'como', 'pero', 'sino', 'cuando', 'donde',
-        'porque', 'aunque', 'mientras', 'también', 'además', 'entonces',
-        'sin', 'sobre', 'entre', 'hasta', 'desde', 'durante', 'hacia',
-        'según', 'contra', 'tras', 'mediante', 'se', 'te', 'me', 'le',
-        'no', 'ya', 'más', 'muy', 'tan', 'bien', 'mal', 'así', 'aún',
-        'es', 'son', 'fue', 'ser', 'hay', 'tiene', 'puede', 'hace',
-    ]
+    # Insert the missing spaces between letters and punctuation in one pass
+    text = _MISSING_SPACE_RE.sub(' ', text)
 
-    for word in common_words:
+    # Fix "que" and common conjunctions stuck to other words.
+    # Passes only insert spaces, so a word absent from the input can never
+    # match later: skip its scan with a cheap substring test.
+    folded = text.casefold()
+    for word, pattern in _STUCK_WORD_PATTERNS:
+        if word not in folded:
+            continue
         # Word stuck after another word: "algoque" → "algo que"
-        pattern = rf'([a-záéíóúüñ])({word})([^a-záéíóúüñ]|$)'
-        text = re.sub(pattern, rf'\1 \2\3', text, flags=re.IGNORECASE)
+        text = pattern.sub(r'\1 \2\3', text)
 
     return text
 
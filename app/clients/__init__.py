@@ -207,11 +207,32 @@ async def stream_chat(
 # ── Utility ───────────────────────────────────────────────
 
 
+# Closed <think>…</think> blocks, or an unterminated one running to the end
+_THINK_RE = re.compile(r'<think>.*?(?:</think>\s*|\Z)', re.DOTALL)
+
+
 def _strip_thinking(text: str) -> str:
     """Remove Qwen3 <think>...</think> blocks from the response."""
-    text = re.sub(r'<think>.*?</think>\s*', '', text, flags=re.DOTALL)
-    text = re.sub(r'<think>.*', '', text, flags=re.DOTALL)
-    return text.strip()
+    return _THINK_RE.sub('', text).strip()
+
+
+# LLM JSON response cleanup: markdown fences, then the outermost object/array
+_FENCE_OPEN_RE = re.compile(r"^```(?:json)?\s*")
+_FENCE_CLOSE_RE = re.compile(r"\s*```$")
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+_JSON_ARRAY_RE = re.compile(r"\[.*\]", re.DOTALL)
+
+
+def extract_json_block(raw: str, *, array: bool = False) -> str:
+    """
+    Strip markdown fences from an LLM reply and return its JSON object
+    (or array, if ``array``). Falls back to the unfenced text when no
+    block is found, so the caller's JSON parser reports the error.
+    """
+    cleaned = _FENCE_OPEN_RE.sub("", raw.strip())
+    cleaned = _FENCE_CLOSE_RE.sub("", cleaned)
+    match = (_JSON_ARRAY_RE if array else _JSON_OBJECT_RE).search(cleaned)
+    return match.group(0) if match else cleaned
 
 
 # ── Health check ──────────────────────────────────────────
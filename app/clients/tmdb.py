@@ -6,7 +6,7 @@ Design patterns:
   - Singleton: shared httpx client with connection pooling
   - Cache Aside: in-memory TTL cache to avoid redundant API calls
   - Retry with Backoff: exponential backoff on rate limits / failures
-  - Semaphore: rate-limited concurrent requests (max 8)
+  - Semaphore: rate-limited concurrent requests (settings.tmdb_concurrency)
 
 Async HTTP client with retry, rate-limiting and backoff for TMDB API v3.
 """
@@ -15,12 +15,12 @@ from __future__ import annotations
 
 import asyncio
 import hashlib
-import json
 import logging
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 import httpx
+import orjson
 
 from app.config import settings
 
@@ -33,9 +33,9 @@ _CACHE_TTL_SECONDS = 3600  # 1 hour for discover results
 _GENRE_CACHE_TTL = 86400  # 24 h for genre list
 
 
-def _cache_key(path: str, params: dict) -> str:
-    raw = f"{path}:{json.dumps(params, sort_keys=True)}"
-    return hashlib.md5(raw.encode()).hexdigest()
+def _cache_key(path: str, params: Dict[str, Any]) -> str:
+    raw = path.encode() + b":" + orjson.dumps(params, option=orjson.OPT_SORT_KEYS)
+    return hashlib.md5(raw).hexdigest()
 
 
 def _get_cached(key: str, ttl: float) -> Optional[Any]:
@@ -63,6 +63,9 @@ async def get_client() -> httpx.AsyncClient:
             base_url=settings.tmdb_base_url,
             headers=settings.tmdb_headers,
             timeout=httpx.Timeout(connect=10.0, read=30.0, write=10.0, pool=10.0),
+            # HTTP/2 multiplexes the detail/keyword/review fan-out on one connection
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
             verify=False,
         )
     return _client
@@ -78,19 +81,20 @@ async def close_client() -> None:
 # ── Rate-limited request with exponential backoff (T-305) ─
 
 
-_RATE_SEMAPHORE = asyncio.Semaphore(8)  # max concurrent requests
+# Process-wide cap shared by every caller (keyword/detail/review fan-out included)
+_RATE_SEMAPHORE = asyncio.Semaphore(settings.tmdb_concurrency)
 _MAX_RETRIES = 3
 
 
 async def _request(
     method: str,
     path: str,
-    params: Optional[Dict[str, Any]] = None,
+    params: Optional[Mapping[str, Any]] = None,
     *,
     cache_ttl: Optional[float] = _CACHE_TTL_SECONDS,
 ) -> Dict[str, Any]:
     """Execute an HTTP request against TMDB with retry + cache."""
-    params = params or {}
+    params = dict(params) if params else {}  # plain dict for orjson / httpx
     ckey = _cache_key(path, params)
 
     if cache_ttl:
@@ -111,7 +115,7 @@ async def _request(
                     await asyncio.sleep(wait)
                     continue
                 resp.raise_for_status()
-                data = resp.json()
+                data = orjson.loads(resp.content)
                 if cache_ttl:
                     _set_cached(ckey, data)
                 return data
@@ -149,7 +153,7 @@ async def search_keyword(text: str) -> List[Dict[str, Any]]:
     return data.get("results", [])
 
 
-async def discover_movies(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+async def discover_movies(params: Mapping[str, Any]) -> List[Dict[str, Any]]:
     """Execute /discover/movie with given params."""
     data = await _request("GET", "/discover/movie", params)
     return data.get("results", [])
@@ -209,25 +209,29 @@ def _is_movie_article(text: str) -> bool:
     return any(ind in text_lower for ind in movie_indicators)
 
 
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Sentences worth surfacing as trivia
+_FACT_PATTERNS = [
+    re.compile(r"(?:recaud|taquilla|box.?office|ganó|won|nominad|nominated|premio|award|oscar|golden|cannes|palma)", re.I),
+    re.compile(r"(?:presupuesto|budget|cost|mill[oó]n|billion)", re.I),
+    re.compile(r"(?:basada?|adapted|inspir|based.?on|novela|book)", re.I),
+    re.compile(r"(?:primer[oa]|first|récord|record|hist[oó]ri|debut)", re.I),
+    re.compile(r"(?:rodaje|filmed|filmación|rodó|shot.?in|location)", re.I),
+    re.compile(r"(?:secuela|sequel|precuela|prequel|trilogía|trilogy|saga|franchise)", re.I),
+]
+
+
 def _extract_facts(text: str) -> List[str]:
     """Extract interesting facts from a movie summary."""
     facts: List[str] = []
-    sentences = re.split(r'(?<=[.!?])\s+', text)
+    sentences = _SENTENCE_SPLIT_RE.split(text)
 
     # Look for interesting patterns
-    fact_patterns = [
-        re.compile(r"(?:recaud|taquilla|box.?office|ganó|won|nominad|nominated|premio|award|oscar|golden|cannes|palma)", re.I),
-        re.compile(r"(?:presupuesto|budget|cost|mill[oó]n|billion)", re.I),
-        re.compile(r"(?:basada?|adapted|inspir|based.?on|novela|book)", re.I),
-        re.compile(r"(?:primer[oa]|first|récord|record|hist[oó]ri|debut)", re.I),
-        re.compile(r"(?:rodaje|filmed|filmación|rodó|shot.?in|location)", re.I),
-        re.compile(r"(?:secuela|sequel|precuela|prequel|trilogía|trilogy|saga|franchise)", re.I),
-    ]
-
     for sentence in sentences:
         if len(sentence) < 20 or len(sentence) > 300:
             continue
-        for pattern in fact_patterns:
+        for pattern in _FACT_PATTERNS:
             if pattern.search(sentence):
                 clean = sentence.strip()
                 if clean and clean not in facts:
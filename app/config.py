@@ -8,8 +8,9 @@ Design patterns:
 
 from __future__ import annotations
 
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -30,11 +31,16 @@ class Settings(BaseSettings):
     tmdb_api_read_token: str = ""
     tmdb_base_url: str = "https://api.themoviedb.org/3"
     tmdb_image_base: str = "https://image.tmdb.org/t/p/w500"
+    tmdb_concurrency: int = Field(8, ge=1)   # max in-flight TMDB requests
 
     # ── App ───────────────────────────────────────────────
     app_host: str = "0.0.0.0"
     app_port: int = 8000
     log_level: str = "info"
+    cors_origins: List[str] = [                      # JSON list in env
+        "http://localhost:3000",
+        "http://127.0.0.1:3000",
+    ]
 
     # ── External APIs (optional, free tiers) ──────────────
     omdb_api_key: Optional[str] = None       # https://www.omdbapi.com/apikey.aspx
@@ -13,12 +13,13 @@ Design patterns:
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import time
 from contextlib import asynccontextmanager
-from typing import Any, AsyncIterator, Dict, List
+from itertools import chain, islice
+from typing import Any, AsyncIterator, Callable, Dict, List
 
+import orjson
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
@@ -28,7 +29,7 @@ from app import clients
 from app.clients import tmdb
 from app.config import settings
 from app.models import RecommendationItem, RecommendRequest, RecommendResponse
-from app.pipeline import run_pipeline
+from app.pipeline import run_pipeline, to_tmdb_locale
 from app.profiler import (
     build_movie_graph,
     get_or_create_profile,
@@ -42,13 +43,45 @@ from app.sessions import (
     get_session,
     save_turn,
 )
-from app.text_processor import clean_narrative
 from app.agents.text_quality import fix_text_quality
 from app.agents.profile_recommender import build_narrative_context
-from app.agents.sentiment import analyze_sentiment
+from app.agents.sentiment import analyze_sentiment_miss, cached_sentiment, sentiment_key
 
 logger = logging.getLogger(__name__)
 
+# SSE token batching: flush once the buffer reaches N chars or T seconds
+_STREAM_FLUSH_CHARS = 32
+_STREAM_FLUSH_SECS = 0.03
+
+
+def _dumps(obj: Any) -> str:
+    """Serialize an SSE payload with orjson (UTF-8, no ASCII escaping)."""
+    return orjson.dumps(obj).decode()
+
+
+# ── Background session/profile writer ─────────────────────
+
+
+async def _writer_worker(queue: asyncio.Queue) -> None:
+    """Drain deferred session/profile writes in FIFO order."""
+    while True:
+        fn, args, kwargs = await queue.get()
+        try:
+            fn(*args, **kwargs)
+        except Exception:
+            logger.exception("Background write %s failed", fn.__name__)
+        finally:
+            queue.task_done()
+
+
+def _enqueue_write(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+    """Defer a write to the background worker (inline if it isn't running)."""
+    queue = getattr(app.state, "write_queue", None)
+    if queue is None:
+        fn(*args, **kwargs)
+        return
+    queue.put_nowait((fn, args, kwargs))
+
 
 # ── Lifespan: startup/shutdown ────────────────────────────
 
@@ -72,9 +105,15 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     except Exception as exc:
         logger.warning("   Could not pre-cache genres: %s", exc)
 
+    app.state.write_queue = asyncio.Queue()
+    writer = asyncio.create_task(_writer_worker(app.state.write_queue))
+
     yield  # app runs here
 
     logger.info("🎬 CineMatch AI shutting down…")
+    await app.state.write_queue.join()
+    writer.cancel()
+    app.state.write_queue = None
     await clients.close_client()
     await tmdb.close_client()
     # Close new API clients
@@ -93,13 +132,12 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# CORS for frontend dev
+# CORS for frontend dev (explicit allowlist; the frontend sends no credentials)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=settings.cors_origins,
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=["Content-Type", "Authorization"],
 )
 
 
@@ -188,14 +226,13 @@ async def recommend(body: RecommendRequest):
             detail=f"El servicio no pudo completar la petición: {exc}",
         )
 
-    # Post-process narrative text to fix tokenization artifacts
-    response.narrative = clean_narrative(response.narrative)
-
-    # If text is still garbled, use LLM rewrite
+    # Narrative arrives cleaned from generate_narrative; if it is
+    # still garbled, use LLM rewrite
     response.narrative = await fix_text_quality(response.narrative)
 
     # Save conversation turn
-    save_turn(
+    _enqueue_write(
+        save_turn,
         session.session_id,
         body.query,
         response.narrative,
@@ -204,13 +241,11 @@ async def recommend(body: RecommendRequest):
     )
 
     # Update user profile
-    enriched_genres = []
-    enriched_keywords = []
-    for film in selected:
-        enriched_genres.extend(film.genres)
-        enriched_keywords.extend(film.keywords[:5])
+    enriched_genres = list(chain.from_iterable(f.genres for f in selected))
+    enriched_keywords = list(chain.from_iterable(islice(f.keywords, 5) for f in selected))
 
-    update_profile_from_interaction(
+    _enqueue_write(
+        update_profile_from_interaction,
         session.session_id,
         body.query,
         entities,
@@ -249,27 +284,27 @@ async def recommend_stream(body: RecommendRequest):
     from app.agents.profile_recommender import build_narrative_context as _build_ctx
 
     async def event_generator() -> AsyncIterator[dict]:
-        tmdb_lang = f"{body.language}-{body.language.upper()}" if len(body.language) == 2 else body.language
+        tmdb_lang = to_tmdb_locale(body.language)
 
         # Phase 1: NLP extraction
-        yield {"event": "status", "data": json.dumps({"phase": "extracting"})}
+        yield {"event": "status", "data": _dumps({"phase": "extracting"})}
         entities = await extract_entities(body.query)
 
         # Phase 2: TMDB query
-        yield {"event": "status", "data": json.dumps({"phase": "searching"})}
+        yield {"event": "status", "data": _dumps({"phase": "searching"})}
         raw = await query_tmdb(entities, language=tmdb_lang, min_year=body.filters.min_year, min_rating=body.filters.min_rating)
 
         if not raw:
             yield {"event": "token", "data": "No encontré películas. Intenta con otra descripción."}
-            yield {"event": "done", "data": json.dumps({"session_id": session.session_id})}
+            yield {"event": "done", "data": _dumps({"session_id": session.session_id})}
             return
 
         # Phase 3: Enrichment
-        yield {"event": "status", "data": json.dumps({"phase": "enriching"})}
+        yield {"event": "status", "data": _dumps({"phase": "enriching"})}
         enriched = await enrich_movies(raw, language=tmdb_lang)
 
         # Phase 4: Re-ranking
-        yield {"event": "status", "data": json.dumps({"phase": "ranking"})}
+        yield {"event": "status", "data": _dumps({"phase": "ranking"})}
         ranked = await rerank_films(body.query, enriched)
         selected = select_top_n(ranked, enriched, n=body.max_results)
 
@@ -300,13 +335,15 @@ async def recommend_stream(body: RecommendRequest):
             }
             for f in selected
         ]
-        yield {"event": "recommendations", "data": json.dumps(recs, ensure_ascii=False)}
+        yield {"event": "recommendations", "data": _dumps(recs)}
 
         # Phase 5: REAL streaming narrative via LangChain
-        yield {"event": "status", "data": json.dumps({"phase": "narrating"})}
+        yield {"event": "status", "data": _dumps({"phase": "narrating"})}
         profile_ctx = _build_ctx(session.session_id)
 
         full_narrative_parts: list[str] = []
+        buf = ""
+        last_flush = time.perf_counter()
 
         try:
             async for token in stream_narrative(
@@ -314,16 +351,27 @@ async def recommend_stream(body: RecommendRequest):
             ):
                 if token:
                     full_narrative_parts.append(token)
-                    yield {"event": "token", "data": token}
+                    buf += token
+                    now = time.perf_counter()
+                    # Coalesce tokens so each SSE send carries a useful chunk
+                    if len(buf) >= _STREAM_FLUSH_CHARS or now - last_flush > _STREAM_FLUSH_SECS:
+                        yield {"event": "token", "data": buf}
+                        buf = ""
+                        last_flush = now
+            if buf:
+                yield {"event": "token", "data": buf}
+                buf = ""
         except Exception as stream_err:
             logger.error("Streaming failed, falling back to non-streaming: %s", stream_err)
+            if buf:
+                yield {"event": "token", "data": buf}
+                buf = ""
             # Fallback: generate complete narrative non-streaming
             from app.agents.reranker import generate_narrative
             raw_narrative = await generate_narrative(
                 body.query, selected, ranked, profile_context=profile_ctx,
             )
-            full_narrative = clean_narrative(raw_narrative)
-            full_narrative = await fix_text_quality(full_narrative)
+            full_narrative = await fix_text_quality(raw_narrative)
 
             # Emit word-by-word as fallback
             words = full_narrative.split(" ")
@@ -335,17 +383,14 @@ async def recommend_stream(body: RecommendRequest):
 
         full_narrative = "".join(full_narrative_parts)
 
-        yield {"event": "done", "data": json.dumps({"session_id": session.session_id})}
+        yield {"event": "done", "data": _dumps({"session_id": session.session_id})}
 
         # Save session
-        save_turn(session.session_id, body.query, full_narrative, entities=entities)
+        _enqueue_write(save_turn, session.session_id, body.query, full_narrative, entities=entities)
 
         # Update user profile
-        enriched_genres = []
-        enriched_keywords = []
-        for film in selected:
-            enriched_genres.extend(film.genres)
-            enriched_keywords.extend(film.keywords[:5])
+        enriched_genres = list(chain.from_iterable(f.genres for f in selected))
+        enriched_keywords = list(chain.from_iterable(islice(f.keywords, 5) for f in selected))
 
         recs_models = [
             RecommendationItem(
@@ -358,7 +403,8 @@ async def recommend_stream(body: RecommendRequest):
             )
             for f in selected
         ]
-        update_profile_from_interaction(
+        _enqueue_write(
+            update_profile_from_interaction,
             session.session_id,
             body.query,
             entities,
@@ -406,7 +452,10 @@ async def analyze_sentiment_endpoint(body: dict):
     text = body.get("text", "")
     if not text:
         raise HTTPException(status_code=422, detail="Text is required")
-    result = analyze_sentiment(text)
+    key = sentiment_key(text)
+    result = cached_sentiment(key)
+    if result is None:
+        result = await asyncio.to_thread(analyze_sentiment_miss, text, key)
     return result
 
 
@@ -11,9 +11,10 @@ Shared data models used across the entire pipeline.
 
 from __future__ import annotations
 
-from typing import List, Optional
+from collections import deque
+from typing import Deque, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # ── Module 1: NLP Extraction ─────────────────────────────
@@ -75,6 +76,8 @@ class EnrichedFilm(BaseModel):
 class RankedFilm(BaseModel):
     """A film after the LLM re-ranker has scored it."""
 
+    model_config = ConfigDict(frozen=True)
+
     tmdb_id: int
     score: float
     reason: str
@@ -135,8 +138,14 @@ class ConversationTurn(BaseModel):
     content: str
 
 
+# Last 10 user/assistant exchanges; older turns fall off the ring buffer
+MAX_SESSION_TURNS = 20
+
+
 class SessionContext(BaseModel):
     session_id: str
-    turns: List[ConversationTurn] = Field(default_factory=list)
+    turns: Deque[ConversationTurn] = Field(
+        default_factory=lambda: deque(maxlen=MAX_SESSION_TURNS),
+    )
     last_entities: Optional[ExtractedEntities] = None
     last_recommendations: List[RecommendationItem] = Field(default_factory=list)
@@ -13,8 +13,10 @@ Pipeline flow:
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
+from functools import lru_cache
 from typing import List, Optional, Tuple
 
 from app.agents.enrichment import enrich_movies
@@ -30,7 +32,7 @@ from app.agents.reranker import (
     rerank_films,
     select_top_n,
 )
-from app.agents.sentiment import analyze_sentiment
+from app.agents.sentiment import analyze_sentiment_miss, cached_sentiment, sentiment_key
 from app.models import (
     EnrichedFilm,
     ExtractedEntities,
@@ -42,6 +44,12 @@ from app.models import (
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=16)
+def to_tmdb_locale(lang: str) -> str:
+    """Expand a 2-letter language code into a TMDB locale (es → es-ES)."""
+    return f"{lang}-{lang.upper()}" if len(lang) == 2 else lang
+
+
 # ── Pipeline Orchestrator (Facade) ────────────────────────
 
 
@@ -62,10 +70,14 @@ async def run_pipeline(
     """
     t0 = time.perf_counter()
     filters = filters or RecommendFilters()
-    tmdb_lang = f"{language}-{language.upper()}" if len(language) == 2 else language
+    tmdb_lang = to_tmdb_locale(language)
 
     # ── Phase 0: Sentiment analysis ───────────────────────
-    sentiment = analyze_sentiment(user_query)
+    # Cache hits are answered inline; only a miss runs the regexes off-loop
+    sentiment_cache_key = sentiment_key(user_query)
+    sentiment = cached_sentiment(sentiment_cache_key)
+    if sentiment is None:
+        sentiment = await asyncio.to_thread(analyze_sentiment_miss, user_query, sentiment_cache_key)
     logger.info(
         "Phase 0 — Sentiment: %s intents=%s",
         sentiment["sentiment_label"],
@@ -133,6 +145,8 @@ async def run_pipeline(
 
     # ── Phase 6: Narrative generation ─────────────────────
     logger.info("Phase 6 — Generating narrative (non-streaming)")
+    # In-memory and cheap: built inline on the loop thread, where profile
+    # updates also happen, so it never races a concurrent mutation
     profile_context = build_narrative_context(session_id)
     narrative = await generate_narrative(
         user_query, selected, ranked, profile_context=profile_context,
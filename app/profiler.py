@@ -2,15 +2,18 @@
 CineMatch AI — User Profiler (Module 7)
 
 Builds and maintains a dynamic user taste profile based on interactions.
-Uses regex patterns + LLM analysis to detect preferences.
+Uses keyword matching + LLM analysis to detect preferences.
 """
 
 from __future__ import annotations
 
 import re
+import heapq
 import logging
-from typing import Any, Dict, List, Optional
-from collections import Counter
+from itertools import combinations, count
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Pattern, Set, Tuple
+from collections import Counter, defaultdict, deque
+from operator import itemgetter
 
 from app.models import (
     ConversationTurn,
@@ -20,42 +23,122 @@ from app.models import (
 
 logger = logging.getLogger(__name__)
 
-# ── Regex-based sentiment / preference detectors ──────────
-
-_POSITIVE_PATTERNS = [
-    re.compile(r"\b(me encant[óa]|genial|perfecto|buena|excelente|increíble|gran(?:de)?|fantástic[oa]|me gust[óa])\b", re.IGNORECASE),
-    re.compile(r"\b(loved?|great|amazing|awesome|perfect|fantastic|excellent|wonderful)\b", re.IGNORECASE),
-    re.compile(r"\b(sí|claro|exacto|vale|por supuesto|definitivamente)\b", re.IGNORECASE),
-]
+# ── Keyword-based sentiment / preference detectors ────────
+#
+# Every term is matched as a whole word (or run of whole words) against the
+# lowercased message. All tables feed one index so a message is tokenized
+# and scanned exactly once, however many terms there are.
+
+_POSITIVE_TERMS = (
+    "me encantó", "me encanta", "genial", "perfecto", "buena", "excelente",
+    "increíble", "gran", "grande", "fantástico", "fantástica", "me gustó", "me gusta",
+    "love", "loved", "great", "amazing", "awesome", "perfect", "fantastic",
+    "excellent", "wonderful",
+    "sí", "claro", "exacto", "vale", "por supuesto", "definitivamente",
+)
 
-_NEGATIVE_PATTERNS = [
-    re.compile(r"\b(no me gust[óa]|abort|horribl[e]|mala|aburrida|no quiero|nada de|ni hablar)\b", re.IGNORECASE),
-    re.compile(r"\b(hate[ds]?|boring|terrible|awful|dislike[ds]?|worst|overrated)\b", re.IGNORECASE),
-    re.compile(r"\b(no(?:pe)?|never|jamás|nah|para nada)\b", re.IGNORECASE),
-]
+_NEGATIVE_TERMS = (
+    "no me gustó", "no me gusta", "abort", "horrible", "mala", "aburrida",
+    "no quiero", "nada de", "ni hablar",
+    "hate", "hated", "hates", "boring", "terrible", "awful", "dislike", "disliked",
+    "dislikes", "worst", "overrated",
+    "no", "nope", "never", "jamás", "nah", "para nada",
+)
 
-_MOOD_PATTERNS = {
-    "intelectual": re.compile(r"\b(pens(?:ar|ativo)|reflexi[óo]n|filosóf|profund[oa]|cerebral|complej[oa]|think|thought)\b", re.IGNORECASE),
-    "emocional": re.compile(r"\b(llor(?:ar|é)|emoci[oó]n|conmov|sentiment|triste|heart|cry|tears|feel)\b", re.IGNORECASE),
-    "adrenalina": re.compile(r"\b(acción|adrenalina|explosion|tir[oa]|pelea|fight|action|thrilling|chase)\b", re.IGNORECASE),
-    "humor": re.compile(r"\b(risa|gracioso|comedia|humor|funny|laugh|hilarious|comedy)\b", re.IGNORECASE),
-    "oscuro": re.compile(r"\b(oscur[oa]|dark|noir|perturbad|inquietante|macabr|creepy|disturbing)\b", re.IGNORECASE),
-    "nostálgico": re.compile(r"\b(nostalgi|retro|clásic|vintage|old.?school|classic|remember)\b", re.IGNORECASE),
-    "romántico": re.compile(r"\b(rom[aá]ntic|amor|love|pareja|couple|relationship|passion)\b", re.IGNORECASE),
-    "familiar": re.compile(r"\b(famili|niños|kids|infantil|child|family|todos|all.?ages)\b", re.IGNORECASE),
+_MOOD_TERMS: Dict[str, Tuple[str, ...]] = {
+    "intelectual": ("pensar", "pensativo", "reflexión", "reflexion", "filosóf", "profundo",
+                    "profunda", "cerebral", "complejo", "compleja", "think", "thought"),
+    "emocional": ("llorar", "lloré", "emoción", "emocion", "conmov", "sentiment", "triste",
+                  "heart", "cry", "tears", "feel"),
+    "adrenalina": ("acción", "adrenalina", "explosion", "tiro", "tira", "pelea", "fight",
+                   "action", "thrilling", "chase"),
+    "humor": ("risa", "gracioso", "comedia", "humor", "funny", "laugh", "hilarious", "comedy"),
+    "oscuro": ("oscuro", "oscura", "dark", "noir", "perturbad", "inquietante", "macabr",
+               "creepy", "disturbing"),
+    "nostálgico": ("nostalgi", "retro", "clásic", "vintage", "classic", "remember"),
+    "romántico": ("romantic", "romántic", "amor", "love", "pareja", "couple",
+                  "relationship", "passion"),
+    "familiar": ("famili", "niños", "kids", "infantil", "child", "family", "todos"),
 }
 
-_ERA_PATTERNS = {
-    "clásico": re.compile(r"\b(clásic[oa]s?|classic|antigua|old)\b", re.IGNORECASE),
-    "80s": re.compile(r"\b(80s?|ochenta|eighties)\b", re.IGNORECASE),
-    "90s": re.compile(r"\b(90s?|noventa|nineties)\b", re.IGNORECASE),
-    "2000s": re.compile(r"\b(2000s?|dos.?mil)\b", re.IGNORECASE),
-    "reciente": re.compile(r"\b(reciente|nueva|actual|recent|new|latest|2020|2021|2022|2023|2024|2025|2026)\b", re.IGNORECASE),
+_ERA_TERMS: Dict[str, Tuple[str, ...]] = {
+    "clásico": ("clásico", "clásica", "clásicos", "clásicas", "classic", "antigua", "old"),
+    "80s": ("80", "80s", "ochenta", "eighties"),
+    "90s": ("90", "90s", "noventa", "nineties"),
+    "2000s": ("2000", "2000s"),
+    "reciente": ("reciente", "nueva", "actual", "recent", "new", "latest",
+                 "2020", "2021", "2022", "2023", "2024", "2025", "2026"),
 }
 
+# (kind, label) tags: ("sentiment", "positive"|"negative"), ("mood", …), ("era", …)
+_Tag = Tuple[str, str]
+
+# Terms with a free-form separator ("old-school", "all ages", "dos mil") can't be
+# literalised; they stay regexes, tried only at tokens that can start them.
+_LOOSE_TERMS: List[Tuple[_Tag, Tuple[str, ...], str]] = [
+    (("mood", "nostálgico"), ("old", "oldschool"), r"old.?school\b"),
+    (("mood", "familiar"), ("all", "allages"), r"all.?ages\b"),
+    (("era", "2000s"), ("dos", "dosmil"), r"dos.?mil\b"),
+]
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _build_term_index() -> Tuple[Dict[str, List[_Tag]], Dict[str, List[Tuple[Pattern[str], _Tag]]]]:
+    """Index single-word terms by word, and multi-word terms by their first word."""
+    groups: List[Tuple[_Tag, Tuple[str, ...]]] = [
+        (("sentiment", "positive"), _POSITIVE_TERMS),
+        (("sentiment", "negative"), _NEGATIVE_TERMS),
+    ]
+    groups += [(("mood", m), terms) for m, terms in _MOOD_TERMS.items()]
+    groups += [(("era", e), terms) for e, terms in _ERA_TERMS.items()]
+
+    words: Dict[str, List[_Tag]] = {}
+    phrases: Dict[str, List[Tuple[Pattern[str], _Tag]]] = {}
+    for tag, terms in groups:
+        for term in terms:
+            term = term.casefold()  # match against casefolded input, no IGNORECASE
+            if " " in term:
+                head = term.split(" ", 1)[0]
+                phrases.setdefault(head, []).append((re.compile(re.escape(term) + r"\b"), tag))
+            else:
+                words.setdefault(term, []).append(tag)
+    for tag, heads, pattern in _LOOSE_TERMS:
+        compiled = re.compile(pattern)
+        for head in heads:
+            phrases.setdefault(head, []).append((compiled, tag))
+    return words, phrases
+
+
+_WORD_INDEX, _PHRASE_INDEX = _build_term_index()
+
+
+def _match_terms(text_cf: str) -> List[_Tag]:
+    """Return one tag per term occurrence in an already-casefolded text."""
+    hits: List[_Tag] = []
+    for m in _WORD_RE.finditer(text_cf):
+        tok = m.group()
+        tags = _WORD_INDEX.get(tok)
+        if tags:
+            hits.extend(tags)
+        for pattern, tag in _PHRASE_INDEX.get(tok, ()):
+            if pattern.match(text_cf, m.start()):
+                hits.append(tag)
+    return hits
+
 
 # ── User Profile Model ───────────────────────────────────
 
+# Process-wide version source: every profile mutation gets a fresh stamp,
+# so (session_id, version) never repeats even if a profile is recreated.
+_version_counter = count(1)
+
+
+def _top(counter: Counter, n: int) -> List[Tuple[str, int]]:
+    """``counter.most_common(n)`` without the Counter method overhead (same tie order)."""
+    return heapq.nlargest(n, counter.items(), key=itemgetter(1))
+
+
 class UserProfile:
     """Dynamic user preference profile built from interactions."""
 
@@ -66,36 +149,70 @@ class UserProfile:
         self.era_preference: Counter = Counter()         # era → score
         self.director_affinity: Counter = Counter()      # director → score
         self.country_preference: Counter = Counter()     # country → score
-        self.liked_movies: List[int] = []                # tmdb_ids
-        self.disliked_movies: List[int] = []             # tmdb_ids
+        self.liked_movies: Deque[int] = deque(maxlen=64)     # tmdb_ids, newest last
+        self.disliked_movies: Deque[int] = deque(maxlen=32)  # tmdb_ids, newest last
         self.interaction_count: int = 0
         self.avg_preferred_rating: float = 7.0
-        self.tags: List[str] = []                         # computed archetype tags
+        self.version: int = 0                             # bumped on every update
+        self._cache: Dict[Any, Any] = {}                  # derived views for _cache_version
+        self._cache_version: int = -1
+
+    def _cached(self, key: Any, build: Callable[[], Any], refresh: bool = False) -> Any:
+        """Memoize a derived view until the profile version changes."""
+        if self._cache_version != self.version:
+            self._cache = {}
+            self._cache_version = self.version
+        if refresh or key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
 
     def to_dict(self) -> Dict[str, Any]:
+        """Serialized profile; cached per version, so treat it as read-only."""
+        return self._cached("dict", self._build_dict)
+
+    def _build_dict(self) -> Dict[str, Any]:
         return {
-            "genre_affinity": dict(self.genre_affinity.most_common(10)),
-            "keyword_affinity": dict(self.keyword_affinity.most_common(15)),
-            "mood_affinity": dict(self.mood_affinity.most_common(5)),
-            "era_preference": dict(self.era_preference.most_common(3)),
-            "director_affinity": dict(self.director_affinity.most_common(5)),
-            "country_preference": dict(self.country_preference.most_common(5)),
-            "liked_movies": self.liked_movies[-20:],
-            "disliked_movies": self.disliked_movies[-10:],
+            "genre_affinity": dict(_top(self.genre_affinity, 10)),
+            "keyword_affinity": dict(_top(self.keyword_affinity, 15)),
+            "mood_affinity": dict(_top(self.mood_affinity, 5)),
+            "era_preference": dict(_top(self.era_preference, 3)),
+            "director_affinity": dict(_top(self.director_affinity, 5)),
+            "country_preference": dict(_top(self.country_preference, 5)),
+            "liked_movies": list(self.liked_movies)[-20:],
+            "disliked_movies": list(self.disliked_movies)[-10:],
             "interaction_count": self.interaction_count,
             "avg_preferred_rating": round(self.avg_preferred_rating, 1),
             "archetype_tags": self.tags,
         }
 
     def top_genres(self, n: int = 5) -> List[str]:
-        return [g for g, _ in self.genre_affinity.most_common(n)]
+        return self._cached(
+            ("top_genres", n), lambda: [g for g, _ in _top(self.genre_affinity, n)],
+        )
 
     def top_moods(self, n: int = 3) -> List[str]:
-        return [m for m, _ in self.mood_affinity.most_common(n)]
+        return self._cached(
+            ("top_moods", n), lambda: [m for m, _ in _top(self.mood_affinity, n)],
+        )
+
+    @property
+    def tags(self) -> List[str]:
+        """Archetype tags, computed lazily on first read after each update."""
+        return self._cached("tags", self._build_archetype_tags)
 
     def compute_archetype_tags(self) -> List[str]:
+        """Recompute archetype tags now, discarding any cached result."""
+        return self._cached("tags", self._build_archetype_tags, refresh=True)
+
+    def _build_archetype_tags(self) -> List[str]:
         """Compute user archetype tags based on accumulated profile data."""
         tags: List[str] = []
+        seen: Set[str] = set()
+
+        def _add(tag: str) -> None:
+            if tag not in seen:
+                seen.add(tag)
+                tags.append(tag)
 
         top_genres = self.top_genres(3)
         top_moods = self.top_moods(2)
@@ -123,7 +240,7 @@ class UserProfile:
 
         for g in top_genres:
             if g in genre_archetypes:
-                tags.append(genre_archetypes[g])
+                _add(genre_archetypes[g])
 
         # Mood-based archetypes
         mood_archetypes = {
@@ -138,17 +255,16 @@ class UserProfile:
         }
 
         for m in top_moods:
-            if m in mood_archetypes and mood_archetypes[m] not in tags:
-                tags.append(mood_archetypes[m])
+            if m in mood_archetypes:
+                _add(mood_archetypes[m])
 
         # Special combos
         if self.interaction_count > 5:
-            tags.append("Cinéfilo Activo")
+            _add("Cinéfilo Activo")
         if len(self.liked_movies) > 8:
-            tags.append("Coleccionista")
+            _add("Coleccionista")
 
-        self.tags = tags[:5]
-        return self.tags
+        return tags[:5]
 
 
 # ── Profile Store ─────────────────────────────────────────
@@ -173,10 +289,13 @@ def delete_profile(session_id: str) -> None:
 # ── Profile Update Logic ─────────────────────────────────
 
 
-def analyze_user_message(text: str) -> Dict[str, Any]:
+def analyze_user_message(text: str, text_cf: Optional[str] = None) -> Dict[str, Any]:
     """
-    Analyze a user message using regex patterns to extract
+    Analyze a user message using keyword tables to extract
     sentiment signals, mood preferences, and era interests.
+
+    ``text_cf`` may carry an already casefolded copy of ``text`` so callers
+    that need it elsewhere don't fold the same string twice.
     """
     analysis: Dict[str, Any] = {
         "sentiment": "neutral",
@@ -186,9 +305,14 @@ def analyze_user_message(text: str) -> Dict[str, Any]:
         "negative_score": 0,
     }
 
+    # Single tokenize + lookup pass over the message
+    if text_cf is None:
+        text_cf = text.casefold()
+    hits = Counter(_match_terms(text_cf))
+
     # Sentiment
-    pos_score = sum(len(p.findall(text)) for p in _POSITIVE_PATTERNS)
-    neg_score = sum(len(p.findall(text)) for p in _NEGATIVE_PATTERNS)
+    pos_score = hits[("sentiment", "positive")]
+    neg_score = hits[("sentiment", "negative")]
     analysis["positive_score"] = pos_score
     analysis["negative_score"] = neg_score
 
@@ -197,19 +321,18 @@ def analyze_user_message(text: str) -> Dict[str, Any]:
     elif neg_score > pos_score:
         analysis["sentiment"] = "negative"
 
-    # Moods
-    for mood, pattern in _MOOD_PATTERNS.items():
-        if pattern.search(text):
-            analysis["detected_moods"].append(mood)
-
-    # Eras
-    for era, pattern in _ERA_PATTERNS.items():
-        if pattern.search(text):
-            analysis["detected_eras"].append(era)
+    # Moods / eras, in table order
+    analysis["detected_moods"] = [m for m in _MOOD_TERMS if ("mood", m) in hits]
+    analysis["detected_eras"] = [e for e in _ERA_TERMS if ("era", e) in hits]
 
     return analysis
 
 
+def _bulk_add(counter: Counter, items: Iterable[str], weight: int) -> None:
+    """Add ``weight`` to ``counter`` for every occurrence in ``items``."""
+    counter.update({k: n * weight for k, n in Counter(items).items()})
+
+
 def update_profile_from_interaction(
     session_id: str,
     user_query: str,
@@ -226,39 +349,42 @@ def update_profile_from_interaction(
     profile = get_or_create_profile(session_id)
     profile.interaction_count += 1
 
-    # Analyze user message
-    analysis = analyze_user_message(user_query)
+    # Analyze user message (casefolded once, shared with the analyzer)
+    user_query_cf = user_query.casefold()
+    analysis = analyze_user_message(user_query, user_query_cf)
 
-    # Update mood affinity from regex detection
-    for mood in analysis["detected_moods"]:
-        profile.mood_affinity[mood] += 2
+    # Collect every contribution per category first, then merge each into
+    # the profile with a single Counter.update
+    mood_delta: Counter = Counter()
+    era_delta: Counter = Counter()
+    genre_delta: Counter = Counter()
+    keyword_delta: Counter = Counter()
 
-    # Update era preferences
-    for era in analysis["detected_eras"]:
-        profile.era_preference[era] += 2
+    # Moods / eras detected in the message
+    _bulk_add(mood_delta, analysis["detected_moods"], 2)
+    _bulk_add(era_delta, analysis["detected_eras"], 2)
 
     # Update from extracted entities
     if entities:
-        for g in entities.genres:
-            profile.genre_affinity[g] += 3  # explicit mention = strong signal
-        for kw in entities.keywords:
-            profile.keyword_affinity[kw] += 2
+        _bulk_add(genre_delta, entities.genres, 3)  # explicit mention = strong signal
+        _bulk_add(keyword_delta, entities.keywords, 2)
         if entities.mood:
             # Match mood to our categories
-            mood_low = entities.mood.lower()
-            for mood_cat, pattern in _MOOD_PATTERNS.items():
-                if pattern.search(mood_low):
-                    profile.mood_affinity[mood_cat] += 1
+            mood_hits = set(_match_terms(entities.mood.casefold()))
+            mood_delta.update(m for m in _MOOD_TERMS if ("mood", m) in mood_hits)
         if entities.era:
-            profile.era_preference[entities.era] += 1
+            era_delta[entities.era] += 1
 
     # Update from enriched movie data (implicit feedback - user saw these)
     if enriched_genres:
-        for g in enriched_genres:
-            profile.genre_affinity[g] += 1
+        genre_delta.update(enriched_genres)
     if enriched_keywords:
-        for kw in enriched_keywords:
-            profile.keyword_affinity[kw] += 1
+        keyword_delta.update(enriched_keywords)
+
+    profile.mood_affinity.update(mood_delta)
+    profile.era_preference.update(era_delta)
+    profile.genre_affinity.update(genre_delta)
+    profile.keyword_affinity.update(keyword_delta)
 
     # Track recommended movies
     if recommendations:
@@ -269,16 +395,23 @@ def update_profile_from_interaction(
                     profile.avg_preferred_rating * 0.7 + rec.score * 0.3
                 )
 
-    # Recompute archetype tags
-    profile.compute_archetype_tags()
+    # New version invalidates every cached view; archetype tags are rebuilt
+    # on their next read (to_dict, graph, narrative context)
+    profile.version = next(_version_counter)
 
     logger.info(
-        "Profile updated for session %s: %d interactions, top_genres=%s, tags=%s",
+        "Profile updated for session %s: %d interactions",
         session_id,
         profile.interaction_count,
-        profile.top_genres(3),
-        profile.tags,
     )
+    if logger.isEnabledFor(logging.DEBUG):
+        # Reading these builds the derived views; keep that off the INFO path
+        logger.debug(
+            "Profile %s: top_genres=%s, tags=%s",
+            session_id,
+            profile.top_genres(3),
+            profile.tags,
+        )
 
     return profile
 
@@ -303,26 +436,30 @@ def build_movie_graph(
     nodes: List[Dict[str, Any]] = []
     links: List[Dict[str, Any]] = []
     node_ids: Dict[str, int] = {}
-    idx = 0
+    type_counts: Counter = Counter()  # node type → count, for the stats block
+    # Bound once; add_node/add_link run O(movies × (genres + keywords)) times
+    get_node_id = node_ids.get
+    append_node = nodes.append
+    append_link = links.append
 
     def add_node(nid: str, label: str, ntype: str, **extra: Any) -> int:
-        nonlocal idx
-        if nid in node_ids:
-            return node_ids[nid]
-        node: Dict[str, Any] = {
+        existing = get_node_id(nid)
+        if existing is not None:
+            return existing
+        idx = len(nodes)
+        append_node({
             "id": nid,
             "label": label,
             "type": ntype,
             "index": idx,
             **extra,
-        }
-        nodes.append(node)
+        })
         node_ids[nid] = idx
-        idx += 1
-        return node_ids[nid]
+        type_counts[ntype] += 1
+        return idx
 
     def add_link(source: str, target: str, rel: str, weight: float = 1.0) -> None:
-        links.append({
+        append_link({
             "source": source,
             "target": target,
             "relation": rel,
@@ -339,20 +476,23 @@ def build_movie_graph(
         add_link("user", tag_id, "es", weight=2.0)
 
     # ── Genre nodes (from profile) ────────────────────────
-    for genre, score in profile.genre_affinity.most_common(8):
+    for genre, score in _top(profile.genre_affinity, 8):
         genre_id = f"genre:{genre}"
         add_node(genre_id, genre, "genre", score=score)
         add_link("user", genre_id, "prefiere", weight=min(score / 3.0, 3.0))
 
     # ── Mood nodes ────────────────────────────────────────
-    for mood, score in profile.mood_affinity.most_common(5):
+    for mood, score in _top(profile.mood_affinity, 5):
         mood_id = f"mood:{mood}"
         add_node(mood_id, mood, "mood", score=score)
         add_link("user", mood_id, "busca", weight=min(score / 2.0, 3.0))
 
     # ── Movie nodes ───────────────────────────────────────
+    # movie id → genre/keyword node ids, in movie node order
+    movie_neighbors: Dict[str, Set[str]] = {}
     for rec in all_recommendations:
         movie_id = f"movie:{rec['tmdb_id']}"
+        neighbors = movie_neighbors.setdefault(movie_id, set())
         add_node(
             movie_id,
             rec.get("title", "?"),
@@ -368,37 +508,35 @@ def build_movie_graph(
             genre_id = f"genre:{genre}"
             add_node(genre_id, genre, "genre")
             add_link(movie_id, genre_id, "pertenece_a", weight=1.5)
+            neighbors.add(genre_id)
 
         # Link movie to keywords
         for kw in rec.get("keywords", [])[:5]:
             kw_id = f"keyword:{kw}"
             add_node(kw_id, kw, "keyword")
             add_link(movie_id, kw_id, "trata_de", weight=1.0)
+            neighbors.add(kw_id)
 
     # ── Cross-movie links (shared genres/keywords = edges) ─
-    # Dijkstra-friendly: movies sharing genres/keywords get linked
-    movie_nodes = [n for n in nodes if n["type"] == "movie"]
-    for i, m1 in enumerate(movie_nodes):
-        for m2 in movie_nodes[i + 1:]:
-            # Find shared neighbors (genres, keywords)
-            m1_neighbors = {
-                l["target"] for l in links
-                if l["source"] == m1["id"] and l["relation"] in ("pertenece_a", "trata_de")
-            }
-            m2_neighbors = {
-                l["target"] for l in links
-                if l["source"] == m2["id"] and l["relation"] in ("pertenece_a", "trata_de")
-            }
-            shared = m1_neighbors & m2_neighbors
-            if shared:
-                add_link(
-                    m1["id"], m2["id"],
-                    "relacionada",
-                    weight=len(shared) * 0.8,
-                )
+    # Dijkstra-friendly: movies sharing genres/keywords get linked.
+    # Invert movie → neighbors so only pairs that actually share a node are counted.
+    movies_by_neighbor: Dict[str, List[str]] = defaultdict(list)
+    for mid, neighbors in movie_neighbors.items():
+        for nid in neighbors:
+            movies_by_neighbor[nid].append(mid)
+
+    pair_shared: Counter = Counter()
+    for mids in movies_by_neighbor.values():
+        pair_shared.update(combinations(mids, 2))
+
+    movie_pos = {mid: i for i, mid in enumerate(movie_neighbors)}
+    for (m1, m2), shared in sorted(
+        pair_shared.items(), key=lambda kv: (movie_pos[kv[0][0]], movie_pos[kv[0][1]]),
+    ):
+        add_link(m1, m2, "relacionada", weight=shared * 0.8)
 
     # ── Keyword cluster nodes ─────────────────────────────
-    for kw, score in profile.keyword_affinity.most_common(10):
+    for kw, score in _top(profile.keyword_affinity, 10):
         kw_id = f"keyword:{kw}"
         if kw_id not in node_ids:
             add_node(kw_id, kw, "keyword", score=score)
@@ -411,8 +549,8 @@ def build_movie_graph(
         "stats": {
             "total_nodes": len(nodes),
             "total_links": len(links),
-            "movie_count": len(movie_nodes),
-            "genre_count": len([n for n in nodes if n["type"] == "genre"]),
-            "keyword_count": len([n for n in nodes if n["type"] == "keyword"]),
+            "movie_count": type_counts["movie"],
+            "genre_count": type_counts["genre"],
+            "keyword_count": type_counts["keyword"],
         },
     }
@@ -8,8 +8,9 @@ Stores context, entities and past recommendations per session.
 from __future__ import annotations
 
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import List, Optional, Tuple
 
 from app.models import (
     ConversationTurn,
@@ -20,21 +21,27 @@ from app.models import (
 
 # ── In-memory store ───────────────────────────────────────
 
-_sessions: Dict[str, SessionContext] = {}
-_timestamps: Dict[str, datetime] = {}
+# session_id → (context, last touched), ordered oldest-touched first
+_sessions: OrderedDict[str, Tuple[SessionContext, datetime]] = OrderedDict()
 _SESSION_TTL = timedelta(hours=2)
 
 
+def _touch(session_id: str, ctx: SessionContext) -> None:
+    """Record activity: refresh the timestamp and move to the newest end."""
+    _sessions[session_id] = (ctx, datetime.utcnow())
+    _sessions.move_to_end(session_id)
+
+
 def get_or_create_session(session_id: Optional[str] = None) -> SessionContext:
     """Return existing session or create a new one."""
     if session_id and session_id in _sessions:
-        _timestamps[session_id] = datetime.utcnow()
-        return _sessions[session_id]
+        ctx = _sessions[session_id][0]
+        _touch(session_id, ctx)
+        return ctx
 
     new_id = session_id or str(uuid.uuid4())
     ctx = SessionContext(session_id=new_id)
-    _sessions[new_id] = ctx
-    _timestamps[new_id] = datetime.utcnow()
+    _touch(new_id, ctx)
     return ctx
 
 
@@ -46,10 +53,13 @@ def save_turn(
     recommendations: Optional[List[RecommendationItem]] = None,
 ) -> None:
     """Append a conversation turn and update session state."""
-    ctx = _sessions.get(session_id)
-    if not ctx:
+    entry = _sessions.get(session_id)
+    if not entry:
         return
+    ctx = entry[0]
+    _touch(session_id, ctx)
 
+    # turns is a bounded deque: the oldest exchange drops off automatically
     ctx.turns.append(ConversationTurn(role="user", content=user_msg))
     ctx.turns.append(ConversationTurn(role="assistant", content=assistant_msg))
 
@@ -58,29 +68,27 @@ def save_turn(
     if recommendations:
         ctx.last_recommendations = recommendations
 
-    # Compress history if it gets too long (keep last 10 turns)
-    if len(ctx.turns) > 20:
-        ctx.turns = ctx.turns[-20:]
-
 
 def get_session(session_id: str) -> Optional[SessionContext]:
     """Get a session by ID."""
-    return _sessions.get(session_id)
+    entry = _sessions.get(session_id)
+    return entry[0] if entry else None
 
 
 def delete_session(session_id: str) -> bool:
     """Delete a session. Returns True if it existed."""
-    existed = session_id in _sessions
-    _sessions.pop(session_id, None)
-    _timestamps.pop(session_id, None)
-    return existed
+    return _sessions.pop(session_id, None) is not None
 
 
 def cleanup_expired() -> int:
     """Remove sessions older than TTL. Returns count removed."""
     now = datetime.utcnow()
-    expired = [sid for sid, ts in _timestamps.items() if now - ts > _SESSION_TTL]
-    for sid in expired:
-        _sessions.pop(sid, None)
-        _timestamps.pop(sid, None)
-    return len(expired)
+    removed = 0
+    # Oldest-touched first: stop at the first session still within TTL
+    while _sessions:
+        _, (_, ts) = next(iter(_sessions.items()))
+        if now - ts <= _SESSION_TTL:
+            break
+        _sessions.popitem(last=False)
+        removed += 1
+    return removed
@@ -8,6 +8,9 @@ non-streaming mode. This module only performs SAFE, light cleanup:
 - Collapse multiple spaces/newlines
 - Strip leading/trailing whitespace
 
+It also provides ``fold_key``, the case/accent-insensitive form used as the
+key of the name lookup tables (genres, regions).
+
 NOTE: Previous versions (v1-v4) had aggressive regex passes (_fix_split_words,
       _fix_missing_spaces) that BROKE properly-spaced text by removing spaces
       between short words like "de", "me", "que", etc.
@@ -18,6 +21,10 @@ from __future__ import annotations
 
 import re
 import unicodedata
+from functools import lru_cache
+
+_MULTI_SPACE = re.compile(r'[^\S\n]+')
+_MULTI_NL = re.compile(r'\n{3,}')
 
 
 def clean_narrative(text: str) -> str:
@@ -28,16 +35,24 @@ def clean_narrative(text: str) -> str:
     if not text:
         return text
 
-    # Normalize unicode (NFC form)
-    text = unicodedata.normalize("NFC", text)
+    # Normalize unicode (NFC form) — skip the copy when already NFC
+    if not unicodedata.is_normalized("NFC", text):
+        text = unicodedata.normalize("NFC", text)
 
     # Collapse multiple spaces into one (but preserve newlines)
-    text = re.sub(r'[^\S\n]+', ' ', text)
+    text = _MULTI_SPACE.sub(' ', text)
 
     # Collapse 3+ newlines into 2
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = _MULTI_NL.sub('\n\n', text)
 
     # Strip leading/trailing whitespace
     text = text.strip()
 
     return text
+
+
+@lru_cache(maxsize=1024)
+def fold_key(text: str) -> str:
+    """Lookup key: stripped, casefolded, accents removed ("Japón " → "japon")."""
+    decomposed = unicodedata.normalize("NFKD", text.strip().casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
@@ -9,44 +9,70 @@ import json
 import pytest
 from fastapi.testclient import TestClient
 
+from app.profiler import get_profile
+from app.sessions import get_session
+
+
+async def _mock_pipeline(
+    user_query, *, session_id, max_results=3, language="es", filters=None, previous_entities=None
+):
+    from app.models import (
+        ExtractedEntities,
+        RecommendationItem,
+        RecommendResponse,
+    )
+
+    recs = [
+        RecommendationItem(
+            tmdb_id=807,
+            title="Heat",
+            year=1995,
+            score=9.1,
+            poster_url="https://image.tmdb.org/t/p/w500/test.jpg",
+            reason="Great heist film",
+        )
+    ]
+    response = RecommendResponse(
+        session_id=session_id,
+        narrative="Here is a great movie for you!",
+        recommendations=recs,
+        processing_time_ms=500,
+    )
+    return response, ExtractedEntities(genres=["thriller"]), []
+
 
 @pytest.fixture
 def client(monkeypatch):
     """Create a test client with mocked pipeline."""
+    monkeypatch.setattr("app.main.run_pipeline", _mock_pipeline)
 
-    async def _mock_pipeline(
-        user_query, *, session_id, max_results=3, language="es", filters=None, previous_entities=None
-    ):
-        from app.models import (
-            ExtractedEntities,
-            RecommendationItem,
-            RecommendResponse,
-        )
+    from app.main import app
+    return TestClient(app)
 
-        recs = [
-            RecommendationItem(
-                tmdb_id=807,
-                title="Heat",
-                year=1995,
-                score=9.1,
-                poster_url="https://image.tmdb.org/t/p/w500/test.jpg",
-                reason="Great heist film",
-            )
-        ]
-        response = RecommendResponse(
-            session_id=session_id,
-            narrative="Here is a great movie for you!",
-            recommendations=recs,
-            processing_time_ms=500,
-        )
-        return response, ExtractedEntities(genres=["thriller"]), []
+
+@pytest.fixture
+def lifespan_client(monkeypatch):
+    """Test client meant for ``with``, so startup/shutdown (and the writer) run."""
+
+    async def _no_genres(language="es-ES"):
+        return []
 
     monkeypatch.setattr("app.main.run_pipeline", _mock_pipeline)
+    monkeypatch.setattr("app.main.tmdb.get_genre_list", _no_genres)
 
     from app.main import app
     return TestClient(app)
 
 
+def _recommend(client: TestClient) -> str:
+    resp = client.post("/api/recommend", json={
+        "query": "Quiero una película de atracos con humor",
+        "max_results": 3,
+    })
+    assert resp.status_code == 200
+    return resp.json()["session_id"]
+
+
 def test_health(client):
     resp = client.get("/api/health")
     assert resp.status_code == 200
@@ -94,3 +120,28 @@ def test_root_serves_html(client):
     resp = client.get("/")
     assert resp.status_code == 200
     assert "CineMatch" in resp.text
+
+
+def test_writes_applied_inline_without_lifespan(client):
+    from app.main import app
+
+    assert getattr(app.state, "write_queue", None) is None
+    session_id = _recommend(client)
+    assert len(get_session(session_id).turns) == 2
+    assert get_profile(session_id).interaction_count == 1
+
+
+def test_background_writer_drains_on_shutdown(lifespan_client):
+    from app.main import _enqueue_write, app
+
+    applied = []
+    with lifespan_client as c:
+        assert app.state.write_queue is not None
+        session_id = _recommend(c)
+        # Queued on the loop thread right before shutdown; lifespan must flush it
+        c.portal.call(_enqueue_write, applied.append, "last")
+
+    assert app.state.write_queue is None
+    assert applied == ["last"]
+    assert len(get_session(session_id).turns) == 2
+    assert get_profile(session_id).interaction_count == 1
@@ -9,6 +9,7 @@ import json
 import pytest
 
 from app.agents.nlp_extractor import (
+    _ENTITY_CACHE,
     _GENRE_NAME_MAP,
     _resolve_genre_ids,
     _resolve_keyword_ids,
@@ -66,6 +67,14 @@ class TestExtractedEntitiesModel:
 # ── Integration-like tests (mock LLM / TMDB in fixtures) ─
 
 
+@pytest.fixture(autouse=True)
+def clear_entity_cache():
+    """Keep the module-level extraction cache from leaking between tests."""
+    _ENTITY_CACHE.clear()
+    yield
+    _ENTITY_CACHE.clear()
+
+
 @pytest.fixture
 def mock_genre_list(monkeypatch):
     """Patch TMDB genre list calls to return a fixed map."""
@@ -105,6 +114,12 @@ async def test_resolve_genre_ids_case_insensitive(mock_genre_list):
     assert 35 in ids
 
 
+@pytest.mark.asyncio
+async def test_resolve_genre_ids_accent_insensitive(mock_genre_list):
+    ids = await _resolve_genre_ids(["ciencia ficcion", "ACCIÓN"])
+    assert sorted(ids) == [28, 878]
+
+
 @pytest.mark.asyncio
 async def test_resolve_keyword_ids(mock_keyword_search):
     ids = await _resolve_keyword_ids(["atraco", "banco"])
@@ -138,3 +153,32 @@ async def test_extract_entities_full(mock_llm_extraction, mock_genre_list, mock_
     assert len(entities.keyword_ids) > 0
     assert entities.region == "ES"
     assert entities.mood == "divertido"
+
+
+@pytest.mark.asyncio
+async def test_extract_entities_cached(monkeypatch, mock_genre_list, mock_keyword_search):
+    calls = []
+
+    async def _fake_chat(messages, **kwargs):
+        calls.append(messages)
+        return json.dumps({"genres": ["drama"], "keywords": []})
+
+    monkeypatch.setattr("app.agents.nlp_extractor.chat_completion", _fake_chat)
+    first = await extract_entities("Algo de drama, por favor")
+    second = await extract_entities("  algo de DRAMA,   por favor ")
+    assert len(calls) == 1
+    assert second == first
+    assert second is not first
+
+
+@pytest.mark.asyncio
+async def test_extract_entities_not_cached_after_keyword_failure(
+    monkeypatch, mock_llm_extraction, mock_genre_list,
+):
+    async def _failing_search(text: str):
+        raise RuntimeError("TMDB down")
+
+    monkeypatch.setattr("app.agents.nlp_extractor.search_keyword", _failing_search)
+    entities = await extract_entities("Quiero una comedia de atracos en España")
+    assert entities.keyword_ids == []
+    assert not _ENTITY_CACHE
@@ -0,0 +1,94 @@
+"""
+Tests for the user profiler (Module 7).
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from app.profiler import analyze_user_message, build_movie_graph, delete_profile
+
+
+class TestAnalyzeUserMessage:
+
+    def test_negated_phrase_counts_both_sides(self):
+        # "me gustó" is positive; "no me gustó" and the bare "no" are negative
+        analysis = analyze_user_message("no me gustó")
+        assert analysis["positive_score"] == 1
+        assert analysis["negative_score"] == 2
+        assert analysis["sentiment"] == "negative"
+
+    def test_positive_message(self):
+        analysis = analyze_user_message("¡Me encantó, genial!")
+        assert analysis["sentiment"] == "positive"
+        assert analysis["negative_score"] == 0
+
+    def test_loose_separator_terms(self):
+        assert "nostálgico" in analyze_user_message("algo old-school")["detected_moods"]
+        assert "nostálgico" in analyze_user_message("algo oldschool")["detected_moods"]
+        assert analyze_user_message("una de los dos mil")["detected_eras"] == ["2000s"]
+
+    def test_whole_word_only(self):
+        # "filosóf" is a table term, but it must not match inside a longer word
+        assert analyze_user_message("algo filosófico")["detected_moods"] == []
+
+    def test_case_insensitive(self):
+        assert analyze_user_message("Una Comedia")["detected_moods"] == ["humor"]
+
+    def test_moods_in_table_order(self):
+        analysis = analyze_user_message("una comedia oscura para pensar")
+        assert analysis["detected_moods"] == ["intelectual", "humor", "oscuro"]
+
+    def test_neutral(self):
+        analysis = analyze_user_message("recomiéndame una película")
+        assert analysis["sentiment"] == "neutral"
+        assert analysis["detected_moods"] == []
+        assert analysis["detected_eras"] == []
+
+
+_GRAPH_RECS = [
+    {"tmdb_id": 1, "title": "A", "genres": ["Drama", "Crimen"], "keywords": ["atraco", "banco"]},
+    {"tmdb_id": 2, "title": "B", "genres": ["Drama", "Crimen"], "keywords": ["atraco"]},
+    {"tmdb_id": 3, "title": "C", "genres": ["Crimen"], "keywords": ["banco"]},
+    {"tmdb_id": 4, "title": "D", "genres": ["Animación"], "keywords": ["robots"]},
+]
+
+
+@pytest.fixture
+def graph():
+    session_id = "test-graph"
+    delete_profile(session_id)
+    yield build_movie_graph(session_id, _GRAPH_RECS)
+    delete_profile(session_id)
+
+
+class TestBuildMovieGraph:
+
+    def test_related_links(self, graph):
+        related = [
+            (link["source"], link["target"], link["weight"])
+            for link in graph["links"] if link["relation"] == "relacionada"
+        ]
+        # Pairs follow movie order; weight is 0.8 per shared genre/keyword
+        assert related == [
+            ("movie:1", "movie:2", pytest.approx(3 * 0.8)),
+            ("movie:1", "movie:3", pytest.approx(2 * 0.8)),
+            ("movie:2", "movie:3", pytest.approx(1 * 0.8)),
+        ]
+
+    def test_unrelated_movie_has_no_related_links(self, graph):
+        assert not any(
+            "movie:4" in (link["source"], link["target"])
+            for link in graph["links"] if link["relation"] == "relacionada"
+        )
+
+    def test_stats(self, graph):
+        # user + 4 movies + 3 genres + 3 keywords; 6 genre + 5 keyword + 3 related links
+        assert graph["stats"] == {
+            "total_nodes": 11,
+            "total_links": 14,
+            "movie_count": 4,
+            "genre_count": 3,
+            "keyword_count": 3,
+        }
+        assert graph["stats"]["total_nodes"] == len(graph["nodes"])
@@ -33,6 +33,14 @@ class TestResolveRegion:
     def test_unknown(self):
         assert _resolve_region("Atlantis") is None
 
+    def test_accent_and_case_insensitive(self):
+        assert _resolve_region("Japon") == "JP"
+        assert _resolve_region("JAPÓN") == "JP"
+        assert _resolve_region("  Reino Unido ") == "GB"
+
+    def test_iso_code_variants_share_result(self):
+        assert _resolve_region("es") == _resolve_region("España") == "ES"
+
 
 class TestEraMap:
 
@@ -73,6 +81,20 @@ class TestBuildDiscoverParams:
         params = build_discover_params(entities)
         assert params["vote_average.gte"] == 5.0
 
+    @pytest.mark.parametrize("mood", ["OSCURA", "sombrío", "darkness", "cine de autor", "indie"])
+    def test_dark_mood_variants(self, mood):
+        params = build_discover_params(ExtractedEntities(mood=mood))
+        assert params["vote_average.gte"] == 5.0
+
+    def test_dark_mood_needs_whole_word(self):
+        # "autoridad" contains "autor" but is not an auteur/dark mood
+        params = build_discover_params(ExtractedEntities(mood="una historia sobre la autoridad"))
+        assert params["vote_average.gte"] == 6.0
+
+    def test_light_mood_keeps_default_rating(self):
+        params = build_discover_params(ExtractedEntities(mood="ligero, divertido"))
+        assert params["vote_average.gte"] == 6.0
+
     def test_min_year_filter(self):
         entities = ExtractedEntities(genre_ids=[28])
         params = build_discover_params(entities, min_year=1990)
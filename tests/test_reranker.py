@@ -8,7 +8,7 @@ import json
 
 import pytest
 
-from app.agents.reranker import rerank_films, select_top_n
+from app.agents.reranker import _title_root, rerank_films, select_top_n
 from app.models import EnrichedFilm, RankedFilm
 
 
@@ -50,6 +50,30 @@ async def test_rerank_films(mock_llm_rerank):
     assert ranked[-1].score == 4.0
 
 
+@pytest.mark.asyncio
+async def test_rerank_films_malformed_items(monkeypatch):
+    """Bad ids are skipped; a non-string reason is blanked, not stringified."""
+
+    async def _fake_chat(messages, **kwargs):
+        return json.dumps([
+            {"id": 1, "score": 8, "reason": None},
+            {"id": 2.0, "score": 7.5, "reason": {"why": "x"}},
+            {"id": 603.9, "score": 9.0, "reason": "Truncated id"},
+            {"id": True, "score": 9.0, "reason": "Bool id"},
+            {"id": None, "score": 9.0, "reason": "Null id"},
+            "not an object",
+            {"id": 4, "score": 6.0},
+        ])
+
+    monkeypatch.setattr("app.agents.reranker.chat_completion", _fake_chat)
+    ranked = await rerank_films("comedia de atracos", [_make_film(1, "Film A")])
+    assert [(r.tmdb_id, r.score, r.reason) for r in ranked] == [
+        (1, 8.0, ""),
+        (2, 7.5, ""),
+        (4, 6.0, ""),
+    ]
+
+
 class TestSelectTopN:
 
     def test_selects_top_3(self):
@@ -84,3 +108,30 @@ class TestSelectTopN:
         assert "The Matrix" in titles
         assert "Inception" in titles
         assert len(selected) == 2  # only 2 unique title roots from 3 candidates
+
+
+class TestTitleRoot:
+    """Franchise keys used by select_top_n deduplication."""
+
+    def test_leading_article_ignored(self):
+        assert _title_root("The Thing") == _title_root("Thing")
+        assert _title_root("El laberinto del fauno") == _title_root("Laberinto del fauno")
+
+    def test_colon_subtitle_collapses(self):
+        assert _title_root("Alien: Covenant") == _title_root("Alien")
+
+    def test_case_and_accents_ignored(self):
+        assert _title_root("AMÉLIE") == _title_root("Amelie")
+
+    def test_dash_does_not_collapse(self):
+        assert _title_root("Tres colores - Azul") != _title_root("Tres colores - Rojo")
+        assert _title_root("Spider-Man") != _title_root("Spider-Woman")
+
+    def test_select_top_n_dedups_article_variants(self):
+        films = [_make_film(1, "The Thing"), _make_film(2, "Thing"), _make_film(3, "Alien")]
+        ranked = [
+            RankedFilm(tmdb_id=1, score=9.0, reason="a"),
+            RankedFilm(tmdb_id=2, score=8.0, reason="b"),
+            RankedFilm(tmdb_id=3, score=7.0, reason="c"),
+        ]
+        assert [f.tmdb_id for f in select_top_n(ranked, films, n=3)] == [1, 3]